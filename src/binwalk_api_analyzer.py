@@ -7,100 +7,145 @@ Version compatibility handling to avoid dep module issues
 
 import os
 import sys
+import queue
+import atexit
 import logging
+import logging.handlers
+import operator
+import importlib.util
+import concurrent.futures
 from pathlib import Path
-import json
+import orjson
 from datetime import datetime
 
+# Directories already created by this process: mkdir(exist_ok=True) still
+# issues a mkdir(2) syscall per call, so skip paths we have seen before
+_ensured_dirs = set()
+
+def _ensure_dir(path):
+    """Create a directory, skipping the syscall when already ensured"""
+    path_str = str(path)
+    if path_str in _ensured_dirs:
+        return
+    os.makedirs(path_str, exist_ok=True)
+    _ensured_dirs.add(path_str)
+
 # Configure logging
 log_dir = Path('log')
-log_dir.mkdir(exist_ok=True)
+_ensure_dir(log_dir)
+
+# Log through a queue so formatting and the file/stream writes happen on a
+# listener thread instead of blocking the analysis hot path
+_log_queue = queue.Queue(-1)
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_log_file_handler = logging.FileHandler('log/binwalk_api_analysis.log')
+_log_file_handler.setFormatter(_log_formatter)
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(_log_formatter)
+
+# The queue handler passes the record through unformatted; the listener's
+# handlers apply the real format
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
 
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('log/binwalk_api_analysis.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[_log_queue_handler]
 )
 
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, _log_file_handler, _log_stream_handler)
+_log_listener.start()
+# Flush queued records before logging.shutdown closes the handlers, so the
+# final summary lines are not lost at interpreter exit
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
+class ImpReplacement:
+    """Minimal stand-in for the imp module removed in Python 3.12+"""
+    PY_SOURCE = 1
+    PY_COMPILED = 2
+    C_EXTENSION = 3
+
+    @staticmethod
+    def find_module(name, path=None):
+        try:
+            spec = importlib.util.find_spec(name, path)
+            if spec is None:
+                return None
+            return (None, spec.origin, ('', '', ImpReplacement.PY_SOURCE))
+        except:
+            return None
+
+    @staticmethod
+    def load_module(name, file, pathname, description):
+        try:
+            spec = importlib.util.spec_from_file_location(name, pathname)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+        except:
+            return None
+
+    @staticmethod
+    def load_source(name, pathname, file=None):
+        try:
+            spec = importlib.util.spec_from_file_location(name, pathname)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+        except:
+            return None
+
 class BinwalkAPIAnalyzer:
+    # Class-level cache so repeated constructions (batch runs, worker pools)
+    # import binwalk's module graph only once per process
+    _binwalk_module = None
+
     def __init__(self, bin_dir="database", output_dir="api_analysis_results"):
         self.bin_dir = Path(bin_dir)
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
-        
+        _ensure_dir(self.output_dir)
+
         # Create subdirectories
         self.extracted_dir = self.output_dir / "extracted"
         self.reports_dir = self.output_dir / "reports"
-        self.extracted_dir.mkdir(exist_ok=True)
-        self.reports_dir.mkdir(exist_ok=True)
+        _ensure_dir(self.extracted_dir)
+        _ensure_dir(self.reports_dir)
         
         self._check_binwalk_api()
     
     def _check_binwalk_api(self):
         """Check if binwalk API is available"""
+        cls = type(self)
+        if cls._binwalk_module is not None:
+            self.binwalk = cls._binwalk_module
+            return True
+
         try:
             # First try to fix imp module issues
             self._patch_imp_module()
-            
+
             import binwalk
+            cls._binwalk_module = binwalk
             self.binwalk = binwalk
             return True
         except Exception as e:
-            logger.error(f"binwalk API not available: {e}")
+            logger.error("binwalk API not available: %s", e)
             logger.info("Will use command line method as fallback")
             self.binwalk = None
             return False
-    
+
     def _patch_imp_module(self):
         """Fix imp module compatibility issues"""
+        if isinstance(sys.modules.get('imp'), ImpReplacement):
+            return
+
         try:
             import imp
         except ModuleNotFoundError:
-            # imp module removed in Python 3.12+, provide alternative implementation
-            import importlib.util
-            import types
-            
-            class ImpReplacement:
-                PY_SOURCE = 1
-                PY_COMPILED = 2
-                C_EXTENSION = 3
-                
-                @staticmethod
-                def find_module(name, path=None):
-                    try:
-                        spec = importlib.util.find_spec(name, path)
-                        if spec is None:
-                            return None
-                        return (None, spec.origin, ('', '', ImpReplacement.PY_SOURCE))
-                    except:
-                        return None
-                
-                @staticmethod
-                def load_module(name, file, pathname, description):
-                    try:
-                        spec = importlib.util.spec_from_file_location(name, pathname)
-                        module = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(module)
-                        return module
-                    except:
-                        return None
-                
-                @staticmethod
-                def load_source(name, pathname, file=None):
-                    try:
-                        spec = importlib.util.spec_from_file_location(name, pathname)
-                        module = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(module)
-                        return module
-                    except:
-                        return None
-            
-            # Inject alternative implementation into sys.modules
+            # imp module removed in Python 3.12+, inject alternative implementation
             sys.modules['imp'] = ImpReplacement()
             logger.info("Fixed imp module compatibility issues")
     
@@ -108,13 +153,14 @@ class BinwalkAPIAnalyzer:
         """Get all .bin files"""
         bin_files = []
         try:
-            for file_path in self.bin_dir.glob("*.bin"):
-                if file_path.is_file():
-                    bin_files.append(file_path)
-            logger.info(f"Found {len(bin_files)} .bin files")
+            with os.scandir(self.bin_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.bin') and entry.is_file(follow_symlinks=False):
+                        bin_files.append(Path(entry.path))
+            logger.info("Found %s .bin files", len(bin_files))
             return bin_files
         except Exception as e:
-            logger.error(f"Error occurred while getting .bin file list: {e}")
+            logger.error("Error occurred while getting .bin file list: %s", e)
             return []
     
     def analyze_with_api(self, bin_file):
@@ -129,113 +175,168 @@ class BinwalkAPIAnalyzer:
         }
         
         try:
-            logger.info(f"Scanning with API: {filename}")
-            
-            # 1. Basic signature scan
+            logger.info("Scanning and extracting with API: %s", filename)
+            extract_dir = self.extracted_dir / filename
+            _ensure_dir(extract_dir)
+
+            # Single scan pass: extraction already yields the signature results,
+            # so scanning separately would read and match the whole file twice
             scan_results = []
-            for module in self.binwalk.scan(str(bin_file)):
-                for result in module.results:
-                    scan_results.append({
-                        'offset': result.offset,
-                        'description': result.description,
-                        'file_path': result.file_path
+            extraction_results = []
+            # Matryoshka scans return thousands of results; hoist attribute
+            # access into one attrgetter call and pre-bind the appends
+            get_fields = operator.attrgetter('offset', 'description', 'file_path')
+            scan_append = scan_results.append
+            extraction_append = extraction_results.append
+            has_extracted = None
+            for module in self.binwalk.scan(str(bin_file),
+                                         signature=True,
+                                         quiet=True,
+                                         extract=True,
+                                         directory=str(extract_dir)):
+                module_results = module.results
+                if has_extracted is None and module_results:
+                    has_extracted = hasattr(module_results[0], 'extracted')
+                for result in module_results:
+                    offset, description, file_path = get_fields(result)
+                    scan_append({
+                        'offset': offset,
+                        'description': description,
+                        'file_path': file_path
                     })
-            
+                    extraction_append({
+                        'offset': offset,
+                        'description': description,
+                        'extracted': result.extracted if has_extracted else False
+                    })
+
             results['api_results']['signature_scan'] = {
                 'results': scan_results,
                 'count': len(scan_results)
             }
-            
-            # 2. Extract files
-            logger.info(f"Extracting files with API: {filename}")
-            extract_dir = self.extracted_dir / filename
-            extract_dir.mkdir(exist_ok=True)
-            
-            extraction_results = []
-            for module in self.binwalk.scan(str(bin_file), 
-                                         signature=True, 
-                                         quiet=True, 
-                                         extract=True,
-                                         directory=str(extract_dir)):
-                for result in module.results:
-                    extraction_results.append({
-                        'offset': result.offset,
-                        'description': result.description,
-                        'extracted': getattr(result, 'extracted', False)
-                    })
-            
+
             results['api_results']['extraction'] = {
                 'results': extraction_results,
                 'count': len(extraction_results),
                 'extract_directory': str(extract_dir)
             }
             
-            logger.info(f"API analysis completed: {filename}")
+            logger.info("API analysis completed: %s", filename)
             return results
             
         except Exception as e:
-            logger.error(f"API analysis failed {filename}: {e}")
+            logger.error("API analysis failed %s: %s", filename, e)
             results['error'] = str(e)
             return results
     
+    def _run_command(self, cmd, timeout):
+        """Run a command, streaming output and keeping only the tail of each stream"""
+        import subprocess
+        import threading
+        from collections import deque
+
+        def _drain(stream, tail):
+            # Bounded deque: matryoshka extractions can emit tens of MB of
+            # output, but the reports only ever show the tail anyway
+            for line in iter(stream.readline, b''):
+                tail.append(line)
+            stream.close()
+
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                bufsize=1 << 16)
+        stdout_tail = deque(maxlen=2000)
+        stderr_tail = deque(maxlen=2000)
+        threads = [
+            threading.Thread(target=_drain, args=(proc.stdout, stdout_tail), daemon=True),
+            threading.Thread(target=_drain, args=(proc.stderr, stderr_tail), daemon=True)
+        ]
+        for t in threads:
+            t.start()
+        try:
+            returncode = proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            raise
+        for t in threads:
+            t.join()
+        stdout = b''.join(stdout_tail).decode('utf-8', errors='replace')
+        stderr = b''.join(stderr_tail).decode('utf-8', errors='replace')
+        return stdout, stderr, returncode
+
     def analyze_with_command(self, bin_file):
         """Analyze using command line method (fallback)"""
-        import subprocess
-        
         filename = bin_file.stem
         results = {
             'filename': str(bin_file),
             'command_results': {}
         }
-        
+
         try:
             # Basic scan
-            logger.info(f"Scanning with command line: {filename}")
+            logger.info("Scanning with command line: %s", filename)
             cmd = ['binwalk', str(bin_file)]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            
+            stdout, stderr, returncode = self._run_command(cmd, timeout=60)
+
             results['command_results']['signature_scan'] = {
                 'command': ' '.join(cmd),
-                'stdout': result.stdout,
-                'stderr': result.stderr,
-                'returncode': result.returncode
+                'stdout': stdout,
+                'stderr': stderr,
+                'returncode': returncode
             }
-            
+
             # Extract
             extract_dir = self.extracted_dir / filename
-            extract_dir.mkdir(exist_ok=True)
-            
-            logger.info(f"Extracting with command line: {filename}")
+            _ensure_dir(extract_dir)
+
+            logger.info("Extracting with command line: %s", filename)
             cmd = ['binwalk', '--extract', '--matryoshka', str(bin_file), '--directory', str(extract_dir)]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            
+            stdout, stderr, returncode = self._run_command(cmd, timeout=300)
+
             results['command_results']['extraction'] = {
                 'command': ' '.join(cmd),
-                'stdout': result.stdout,
-                'stderr': result.stderr,
-                'returncode': result.returncode,
+                'stdout': stdout,
+                'stderr': stderr,
+                'returncode': returncode,
                 'extract_directory': str(extract_dir)
             }
             
-            logger.info(f"Command line analysis completed: {filename}")
+            logger.info("Command line analysis completed: %s", filename)
             return results
             
         except Exception as e:
-            logger.error(f"Command line analysis failed {filename}: {e}")
+            logger.error("Command line analysis failed %s: %s", filename, e)
             results['error'] = str(e)
             return results
     
+    def _prefetch_firmware(self, bin_file):
+        """Hint the kernel to read the firmware ahead of binwalk's sequential scan"""
+        # binwalk reads the image front to back; advising the kernel up front
+        # lets readahead overlap I/O with signature matching (Linux only)
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        try:
+            fd = os.open(str(bin_file), os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
     def analyze_firmware(self, bin_file):
         """Analyze firmware file"""
         filename = bin_file.stem
-        logger.info(f"Starting firmware analysis: {bin_file.name}")
+        logger.info("Starting firmware analysis: %s", bin_file.name)
+        self._prefetch_firmware(bin_file)
         
         # Try API first, fall back to command line if it fails
         if self.binwalk is not None:
             try:
                 return self.analyze_with_api(bin_file)
             except Exception as e:
-                logger.warning(f"API analysis failed, switching to command line mode: {e}")
+                logger.warning("API analysis failed, switching to command line mode: %s", e)
                 return self.analyze_with_command(bin_file)
         else:
             return self.analyze_with_command(bin_file)
@@ -253,60 +354,71 @@ class BinwalkAPIAnalyzer:
             
             # Save JSON format report
             json_report_path = self.reports_dir / f"{filename}_api_analysis.json"
-            with open(json_report_path, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, indent=2, ensure_ascii=False)
+            with open(json_report_path, 'wb') as f:
+                f.write(orjson.dumps(report_data, option=orjson.OPT_INDENT_2))
             
-            # Save text report
+            # Save text report (built as a list and written in one call: repeated
+            # string concatenation would copy the full report per append)
+            parts = [
+                f"Firmware analysis report (API mode): {filename}\n",
+                f"Analysis time: {report_data['analysis_timestamp']}\n",
+                f"Analysis method: {report_data['analysis_method']}\n",
+                "=" * 80 + "\n\n"
+            ]
+
+            if 'api_results' in results:
+                parts.append(self._format_api_results(results['api_results']))
+            elif 'command_results' in results:
+                parts.append(self._format_command_results(results['command_results']))
+
+            if 'error' in results:
+                parts.append(f"Error: {results['error']}\n")
+
+            # Binary mode with one up-front encode: text mode would route every
+            # write through the incremental UTF-8 encoder
             txt_report_path = self.reports_dir / f"{filename}_api_analysis.txt"
-            with open(txt_report_path, 'w', encoding='utf-8') as f:
-                f.write(f"Firmware analysis report (API mode): {filename}\n")
-                f.write(f"Analysis time: {report_data['analysis_timestamp']}\n")
-                f.write(f"Analysis method: {report_data['analysis_method']}\n")
-                f.write("=" * 80 + "\n\n")
-                
-                if 'api_results' in results:
-                    self._write_api_results(f, results['api_results'])
-                elif 'command_results' in results:
-                    self._write_command_results(f, results['command_results'])
-                
-                if 'error' in results:
-                    f.write(f"Error: {results['error']}\n")
+            with open(txt_report_path, 'wb') as f:
+                f.write("".join(parts).encode('utf-8'))
             
-            logger.info(f"Analysis report saved: {json_report_path.name} and {txt_report_path.name}")
+            logger.info("Analysis report saved: %s and %s", json_report_path.name, txt_report_path.name)
             
         except Exception as e:
-            logger.error(f"Error occurred while saving analysis report: {e}")
+            logger.error("Error occurred while saving analysis report: %s", e)
     
-    def _write_api_results(self, f, api_results):
-        """Write API results"""
+    def _format_api_results(self, api_results):
+        """Format API results for the text report"""
+        parts = []
         for analysis_type, data in api_results.items():
-            f.write(f"{analysis_type.upper()}\n")
-            f.write("-" * 40 + "\n")
-            
+            parts.append(f"{analysis_type.upper()}\n")
+            parts.append("-" * 40 + "\n")
+
             if 'results' in data:
-                f.write(f"Found {data['count']} results:\n")
+                parts.append(f"Found {data['count']} results:\n")
                 for i, result in enumerate(data['results'][:10]):  # Only show first 10
-                    f.write(f"  {i+1}. Offset: {result.get('offset', 'N/A')}, Description: {result.get('description', 'N/A')}\n")
+                    parts.append(f"  {i+1}. Offset: {result.get('offset', 'N/A')}, Description: {result.get('description', 'N/A')}\n")
                 if data['count'] > 10:
-                    f.write(f"  ... {data['count'] - 10} more results\n")
-            
+                    parts.append(f"  ... {data['count'] - 10} more results\n")
+
             if 'extract_directory' in data:
-                f.write(f"Extracted directory: {data['extract_directory']}\n")
-            
-            f.write("\n")
-    
-    def _write_command_results(self, f, cmd_results):
-        """Write command line results"""
+                parts.append(f"Extracted directory: {data['extract_directory']}\n")
+
+            parts.append("\n")
+        return "".join(parts)
+
+    def _format_command_results(self, cmd_results):
+        """Format command line results for the text report"""
+        parts = []
         for analysis_type, data in cmd_results.items():
-            f.write(f"{analysis_type.upper()}\n")
-            f.write("-" * 40 + "\n")
-            f.write(f"Command: {data['command']}\n")
-            f.write(f"Return code: {data['returncode']}\n")
+            parts.append(f"{analysis_type.upper()}\n")
+            parts.append("-" * 40 + "\n")
+            parts.append(f"Command: {data['command']}\n")
+            parts.append(f"Return code: {data['returncode']}\n")
             if data['stdout']:
-                f.write(f"Output:\n{data['stdout']}\n")
+                parts.append(f"Output:\n{data['stdout']}\n")
             if data['stderr']:
-                f.write(f"Error:\n{data['stderr']}\n")
-            f.write("\n")
+                parts.append(f"Error:\n{data['stderr']}\n")
+            parts.append("\n")
+        return "".join(parts)
     
     def analyze_all_firmware(self):
         """Analyze all firmware files"""
@@ -320,18 +432,53 @@ class BinwalkAPIAnalyzer:
         
         success_count = 0
         total_count = len(bin_files)
-        
-        for i, bin_file in enumerate(bin_files, 1):
-            logger.info(f"Processing progress: {i}/{total_count}")
-            try:
-                results = self.analyze_firmware(bin_file)
-                self.save_analysis_report(bin_file.stem, results)
-                success_count += 1
-            except Exception as e:
-                logger.error(f"Error occurred while analyzing {bin_file.name}: {e}")
-        
-        logger.info(f"Batch analysis completed: Success {success_count}/{total_count}")
-        logger.info(f"Analysis results saved in: {self.output_dir}")
+
+        # One process per firmware: each analysis is independent and dominated by
+        # extraction time, so this scales with min(#files, #cores).
+        # Cap workers so extraction-heavy (matryoshka) runs don't oversubscribe.
+        max_workers = min(total_count, os.cpu_count() or 1, 8)
+        logger.info("Analyzing with %s worker processes", max_workers)
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(str(self.bin_dir), str(self.output_dir))
+        ) as executor:
+            futures = {executor.submit(_analyze_one_firmware, bin_file): bin_file
+                       for bin_file in bin_files}
+            for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                bin_file = futures[future]
+                logger.info("Processing progress: %s/%s (%s)", i, total_count, bin_file.name)
+                try:
+                    future.result()
+                    success_count += 1
+                except Exception as e:
+                    logger.error("Error occurred while analyzing %s: %s", bin_file.name, e)
+
+        logger.info("Batch analysis completed: Success %s/%s", success_count, total_count)
+        logger.info("Analysis results saved in: %s", self.output_dir)
+
+# Worker-process state for analyze_all_firmware: one analyzer per process,
+# created by the pool initializer so binwalk is imported once per worker.
+_worker_analyzer = None
+
+def _init_worker(bin_dir, output_dir):
+    """Initialize the per-process analyzer for the process pool"""
+    global _worker_analyzer
+    # Workers inherit the parent's QueueHandler but not its listener thread,
+    # so their records would be enqueued and never drained; log directly here
+    root = logging.getLogger()
+    root.handlers.clear()
+    for handler in (logging.FileHandler('log/binwalk_api_analysis.log'),
+                    logging.StreamHandler()):
+        handler.setFormatter(_log_formatter)
+        root.addHandler(handler)
+    _worker_analyzer = BinwalkAPIAnalyzer(bin_dir=bin_dir, output_dir=output_dir)
+
+def _analyze_one_firmware(bin_file):
+    """Analyze a single firmware file in a worker process"""
+    results = _worker_analyzer.analyze_firmware(bin_file)
+    _worker_analyzer.save_analysis_report(bin_file.stem, results)
 
 def main():
     """Main function"""
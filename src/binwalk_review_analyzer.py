@@ -6,17 +6,35 @@ Use large language models to analyze binwalk parsing results and generate review
 """
 
 import os
-import json
+import orjson
+import asyncio
 import datetime
 import logging
+import itertools
 from pathlib import Path
-from typing import Dict, List, Any
-from openai import OpenAI
+from collections import deque
+from typing import Dict, Iterator, List, Tuple, Any
+from concurrent.futures import ThreadPoolExecutor
+from openai import AsyncOpenAI
+
+# Optional Rust-backed directory walker: traversing a 100k-inode extracted
+# tree from Python is interpreter-bound even with os.scandir
+try:
+    import scandir_rs
+except ImportError:
+    scandir_rs = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# File-classification tables for _count_files_by_type: a single dict lookup
+# per entry instead of scanning suffix lists
+_LIB_EXTS = frozenset({'.so', '.a'})
+_CFG_EXTS = frozenset({'.conf', '.cfg', '.ini', '.xml'})
+_EXT_TO_BUCKET = {ext: "libraries" for ext in _LIB_EXTS}
+_EXT_TO_BUCKET.update({ext: "configs" for ext in _CFG_EXTS})
+
 class BinwalkReviewAnalyzer:
     """Binwalk result review analyzer"""
     
@@ -36,55 +54,117 @@ class BinwalkReviewAnalyzer:
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY environment variable or api_key parameter is required")
         
-        # Initialize OpenAI client
+        # Initialize async OpenAI client (one request per firmware runs concurrently)
         if self.base_url:
-            self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+            self.aclient = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
         else:
-            self.client = OpenAI(api_key=self.api_key)
+            self.aclient = AsyncOpenAI(api_key=self.api_key)
         
         self.results_dir = Path("api_analysis_results")
         self.review_dir = Path("review")
         self.review_dir.mkdir(exist_ok=True)
     
-    def read_analysis_results(self) -> Dict[str, Any]:
-        """Read binwalk analysis results"""
-        results = {
-            "reports": {},
-            "extracted_structure": {},
-            "firmware_files": []
-        }
-        
-        # Read report files
+    @staticmethod
+    def _load_report(path: str) -> Dict[str, Any]:
+        """Load a single JSON report file"""
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+
+    def _list_firmware_files(self) -> List[Dict[str, Any]]:
+        """Get original firmware file information"""
+        firmware_files = []
+        database_dir = Path("database")
+        if database_dir.exists():
+            with os.scandir(database_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".bin"):
+                        continue
+                    size = entry.stat().st_size
+                    firmware_files.append({
+                        "name": entry.name,
+                        "size": size,
+                        "size_mb": round(size / (1024 * 1024), 2)
+                    })
+        return firmware_files
+
+    def _list_report_paths(self) -> Dict[str, str]:
+        """Map firmware names to report paths (scandir avoids per-entry stats)"""
+        report_paths = {}
         reports_dir = self.results_dir / "reports"
         if reports_dir.exists():
-            for report_file in reports_dir.glob("*.json"):
-                firmware_name = report_file.stem.replace("_api_analysis", "")
-                with open(report_file, 'r', encoding='utf-8') as f:
-                    results["reports"][firmware_name] = json.load(f)
-                logger.info(f"Reading report: {firmware_name}")
-        
-        # Analyze extracted file structure
+            with os.scandir(reports_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not name.endswith(".json") or name.endswith("_struct_cache.json"):
+                        continue
+                    if name.endswith("_api_analysis.json"):
+                        firmware_name = name[:-len("_api_analysis.json")]
+                    else:
+                        firmware_name = name[:-len(".json")]
+                    report_paths[firmware_name] = entry.path
+        return report_paths
+
+    def iter_firmwares(self, firmware_files: List[Dict[str, Any]] = None
+                       ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield one compact per-firmware payload at a time
+
+        Raw reports are parsed, compressed and dropped inside the worker, so
+        peak memory is bounded by the prefetch window instead of the sum of
+        every parsed report.
+        """
+        if firmware_files is None:
+            firmware_files = self._list_firmware_files()
+
+        report_paths = self._list_report_paths()
+
+        extract_dirs = {}
         extracted_dir = self.results_dir / "extracted"
         if extracted_dir.exists():
             for firmware_dir in extracted_dir.iterdir():
                 if firmware_dir.is_dir():
-                    firmware_name = firmware_dir.name
-                    results["extracted_structure"][firmware_name] = self._analyze_extracted_structure(firmware_dir)
-                    logger.info(f"Analyzing extraction structure: {firmware_name}")
-        
-        # Get original firmware file information
-        database_dir = Path("database")
-        if database_dir.exists():
-            for firmware_file in database_dir.glob("*.bin"):
-                file_stat = firmware_file.stat()
-                results["firmware_files"].append({
-                    "name": firmware_file.name,
-                    "size": file_stat.st_size,
-                    "size_mb": round(file_stat.st_size / (1024 * 1024), 2)
-                })
-        
-        return results
+                    extract_dirs[firmware_dir.name] = firmware_dir
+
+        def _load_one(name):
+            payload = {
+                "firmware_files": [f for f in firmware_files
+                                   if os.path.splitext(f['name'])[0] == name],
+                "reports": {},
+                "extracted_structure": {}
+            }
+            if name in report_paths:
+                payload["reports"][name] = self._compress_report(self._load_report(report_paths[name]))
+            if name in extract_dirs:
+                payload["extracted_structure"][name] = self._analyze_extracted_structure(extract_dirs[name])
+            return payload
+
+        names = sorted(set(report_paths) | set(extract_dirs))
+        logger.info("Reading analysis results for %s firmwares", len(names))
+
+        # Bounded prefetch window: loads overlap I/O without materializing
+        # every firmware's data at once
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            pending = deque()
+            name_iter = iter(names)
+            for name in itertools.islice(name_iter, 16):
+                pending.append((name, executor.submit(_load_one, name)))
+            while pending:
+                name, future = pending.popleft()
+                next_name = next(name_iter, None)
+                if next_name is not None:
+                    pending.append((next_name, executor.submit(_load_one, next_name)))
+                yield name, future.result()
     
+    def _structure_cache_key(self, firmware_dir: Path, extracted_path: Path) -> List[int]:
+        """Build an mtime key for the structure cache (None if uncacheable)"""
+        try:
+            key = [os.stat(firmware_dir).st_mtime_ns, os.stat(extracted_path).st_mtime_ns]
+            # Include top-level children so re-extraction invalidates the cache
+            with os.scandir(extracted_path) as entries:
+                key.append(max((e.stat(follow_symlinks=False).st_mtime_ns for e in entries), default=0))
+            return key
+        except OSError:
+            return None
+
     def _analyze_extracted_structure(self, firmware_dir: Path) -> Dict[str, Any]:
         """Analyze firmware extraction directory structure"""
         structure = {
@@ -94,8 +174,21 @@ class BinwalkReviewAnalyzer:
             "file_counts": {},
             "suspicious_files": []
         }
-        
+
         extracted_path = firmware_dir / f"_{firmware_dir.name}.bin.extracted"
+
+        # Re-walking an unchanged squashfs tree dominates review wall time,
+        # so cache the computed structure keyed by directory mtimes
+        cache_key = self._structure_cache_key(firmware_dir, extracted_path)
+        cache_file = self.results_dir / "reports" / f"{firmware_dir.name}_struct_cache.json"
+        if cache_key is not None and cache_file.exists():
+            try:
+                cached = orjson.loads(cache_file.read_bytes())
+                if cached.get("mtime_key") == cache_key:
+                    return cached["structure"]
+            except (ValueError, OSError) as e:
+                logger.warning("Ignoring unreadable structure cache %s: %s", cache_file.name, e)
+
         if extracted_path.exists():
             structure["extraction_success"] = True
             
@@ -115,41 +208,89 @@ class BinwalkReviewAnalyzer:
                             "size": item.stat().st_size,
                             "type": "compressed_archive"
                         })
-        
+
+        if cache_key is not None:
+            try:
+                cache_file.write_bytes(orjson.dumps({"mtime_key": cache_key, "structure": structure}))
+            except OSError as e:
+                logger.warning("Failed to write structure cache %s: %s", cache_file.name, e)
+
         return structure
     
     def _get_filesystem_structure(self, root_path: Path) -> List[str]:
         """Get basic filesystem structure"""
         structure = []
-        if root_path.exists():
-            for item in root_path.iterdir():
-                if item.is_dir():
-                    structure.append(item.name)
+        try:
+            with os.scandir(root_path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        structure.append(entry.name)
+        except FileNotFoundError:
+            pass
         return sorted(structure)
-    
+
+    def _count_files_by_type_native(self, root_path: Path) -> Dict[str, int]:
+        """Count files by type using the scandir_rs walker (None on failure)"""
+        counts = {"directories": 0, "executables": 0, "configs": 0, "libraries": 0, "other": 0}
+
+        try:
+            toc = scandir_rs.walk.Walk(str(root_path)).collect()
+        except Exception as e:
+            logger.warning("scandir_rs walk failed, falling back to os.scandir: %s", e)
+            return None
+
+        counts["directories"] = len(toc.dirs)
+        root = str(root_path)
+        for rel_path in toc.files:
+            name = os.path.basename(rel_path)
+            bucket = _EXT_TO_BUCKET.get(os.path.splitext(name)[1])
+            if bucket is not None:
+                counts[bucket] += 1
+                continue
+            # Exec-bit check still needs a stat; only unclassified names pay it
+            try:
+                if name in ('bin', 'sbin') or (os.stat(os.path.join(root, rel_path), follow_symlinks=False).st_mode & 0o111):
+                    counts["executables"] += 1
+                    continue
+            except OSError:
+                pass
+            counts["other"] += 1
+        return counts
+
     def _count_files_by_type(self, root_path: Path) -> Dict[str, int]:
         """Count files by type"""
         counts = {"directories": 0, "executables": 0, "configs": 0, "libraries": 0, "other": 0}
-        
+
         if not root_path.exists():
             return counts
-        
+
+        if scandir_rs is not None:
+            native_counts = self._count_files_by_type_native(root_path)
+            if native_counts is not None:
+                return native_counts
+
+        # Walk with os.scandir so type checks come from the cached DirEntry
+        # instead of one stat() per check (extracted trees hold 50-200k inodes)
+        stack = [str(root_path)]
         try:
-            for item in root_path.rglob("*"):
-                if item.is_dir():
-                    counts["directories"] += 1
-                elif item.is_file():
-                    if item.suffix in ['.so', '.a']:
-                        counts["libraries"] += 1
-                    elif item.suffix in ['.conf', '.cfg', '.ini', '.xml']:
-                        counts["configs"] += 1
-                    elif item.name in ['bin', 'sbin'] or (item.stat().st_mode & 0o111):
-                        counts["executables"] += 1
-                    else:
-                        counts["other"] += 1
+            while stack:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            counts["directories"] += 1
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            suffix = os.path.splitext(entry.name)[1]
+                            bucket = _EXT_TO_BUCKET.get(suffix)
+                            if bucket is not None:
+                                counts[bucket] += 1
+                            elif entry.name in ('bin', 'sbin') or (entry.stat(follow_symlinks=False).st_mode & 0o111):
+                                counts["executables"] += 1
+                            else:
+                                counts["other"] += 1
         except (PermissionError, OSError) as e:
-            logger.warning(f"Unable to fully analyze directory structure: {e}")
-        
+            logger.warning("Unable to fully analyze directory structure: %s", e)
+
         return counts
     
     def generate_review_prompt(self, analysis_data: Dict[str, Any]) -> str:
@@ -160,13 +301,13 @@ As a firmware security analysis expert, please analyze the correctness and compl
 ## Analysis Data
 
 ### Firmware File Information
-{json.dumps(analysis_data['firmware_files'], indent=2, ensure_ascii=False)}
+{orjson.dumps(analysis_data['firmware_files']).decode()}
 
 ### Binwalk Analysis Reports
-{json.dumps(analysis_data['reports'], indent=2, ensure_ascii=False)}
+{orjson.dumps(analysis_data['reports']).decode()}
 
 ### Extracted File Structure Analysis
-{json.dumps(analysis_data['extracted_structure'], indent=2, ensure_ascii=False)}
+{orjson.dumps(analysis_data['extracted_structure']).decode()}
 
 ## Please analyze from the following perspectives:
 
@@ -205,16 +346,64 @@ Please ensure the analysis is professional, objective, and detailed.
 """
         return prompt
     
-    def analyze_with_llm(self, analysis_data: Dict[str, Any]) -> str:
-        """Use large language model to analyze binwalk results"""
-        prompt = self.generate_review_prompt(analysis_data)
-        
-        try:
-            response = self.client.chat.completions.create(
+    # How many signature/extraction results per firmware go into the prompt
+    PROMPT_TOP_K = 50
+
+    def _compress_report(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Reduce a raw binwalk report to the fields the review actually needs"""
+        compressed = {
+            "firmware_name": report.get("firmware_name"),
+            "analysis_timestamp": report.get("analysis_timestamp"),
+            "analysis_method": report.get("analysis_method")
+        }
+        results = report.get("results", {})
+        for results_key in ("api_results", "command_results"):
+            for analysis_type, data in results.get(results_key, {}).items():
+                if not isinstance(data, dict):
+                    continue
+                # Keep offsets/descriptions and counts; drop stdout/stderr blobs
+                # and command echoes, which only inflate the token count
+                entry = {}
+                if "count" in data:
+                    entry["count"] = data["count"]
+                if "returncode" in data:
+                    entry["returncode"] = data["returncode"]
+                if "results" in data:
+                    entry["results"] = [
+                        {"offset": r.get("offset"), "description": r.get("description")}
+                        for r in data["results"][:self.PROMPT_TOP_K]
+                    ]
+                compressed.setdefault(results_key, {})[analysis_type] = entry
+        if "error" in results:
+            compressed["error"] = results["error"]
+        return compressed
+
+    def _compress_structure(self, structure: Dict[str, Any]) -> Dict[str, Any]:
+        """Trim an extracted-structure dict for the prompt"""
+        compressed = dict(structure)
+        fs_structure = compressed.get("filesystem_structure") or []
+        if len(fs_structure) > 20:
+            compressed["filesystem_structure"] = (
+                fs_structure[:20] + [f"... {len(fs_structure) - 20} more entries"]
+            )
+        return compressed
+
+    async def _analyze_one(self, firmware_name: str, fw_data: Dict[str, Any],
+                           semaphore: asyncio.Semaphore) -> str:
+        """Run the LLM review for a single firmware"""
+        prompt = self.generate_review_prompt({
+            "firmware_files": fw_data["firmware_files"],
+            "reports": fw_data["reports"],
+            "extracted_structure": {k: self._compress_structure(v)
+                                    for k, v in fw_data["extracted_structure"].items()}
+        })
+        async with semaphore:
+            logger.info("Requesting LLM review: %s", firmware_name)
+            response = await self.aclient.chat.completions.create(
                 model=self.model,
                 messages=[
                     {
-                        "role": "system", 
+                        "role": "system",
                         "content": "You are a professional firmware security analysis expert, proficient in binwalk tools and embedded system firmware analysis."
                     },
                     {"role": "user", "content": prompt}
@@ -222,17 +411,39 @@ Please ensure the analysis is professional, objective, and detailed.
                 temperature=0.3,
                 max_tokens=4000
             )
-            
-            return response.choices[0].message.content
+        return response.choices[0].message.content
+
+    async def _analyze_all(self, per_firmware: Dict[str, Dict[str, Any]]) -> List[Any]:
+        """Fan out one LLM request per firmware, bounded to respect rate limits"""
+        semaphore = asyncio.Semaphore(8)
+        tasks = [self._analyze_one(name, fw_data, semaphore)
+                 for name, fw_data in per_firmware.items()]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    def analyze_with_llm(self, per_firmware: Dict[str, Dict[str, Any]]) -> str:
+        """Use large language model to analyze binwalk results"""
+        try:
+            analyses = asyncio.run(self._analyze_all(per_firmware))
         except Exception as e:
-            logger.error(f"LLM analysis failed: {e}")
+            logger.error("LLM analysis failed: %s", e)
             return f"LLM analysis failed: {str(e)}"
+
+        sections = []
+        for firmware_name, analysis in zip(per_firmware, analyses):
+            if isinstance(analysis, Exception):
+                logger.error("LLM analysis failed %s: %s", firmware_name, analysis)
+                analysis = f"LLM analysis failed: {analysis}"
+            sections.append(f"### {firmware_name}\n\n{analysis}")
+        return "\n\n".join(sections)
     
-    def generate_detailed_report(self, analysis_data: Dict[str, Any], llm_analysis: str) -> str:
+    def generate_detailed_report(self, firmware_files: List[Dict[str, Any]],
+                                 per_firmware: Dict[str, Dict[str, Any]],
+                                 llm_analysis: str) -> str:
         """Generate detailed review report"""
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        report = f"""# Binwalk Parsing Results Review Report
+        # Accumulate into a list: repeated += on an immutable str is O(N^2)
+        parts = [f"""# Binwalk Parsing Results Review Report
 
 **Generated Time**: {timestamp}
 **Analysis Tools**: Binwalk + GPT-4 Intelligent Analysis
@@ -243,12 +454,12 @@ Please ensure the analysis is professional, objective, and detailed.
 ## 1. Overview
 
 ### Analyzed Firmware Files
-"""
+"""]
         
-        for firmware in analysis_data['firmware_files']:
-            report += f"- **{firmware['name']}**: {firmware['size_mb']} MB\n"
+        for firmware in firmware_files:
+            parts.append(f"- **{firmware['name']}**: {firmware['size_mb']} MB\n")
         
-        report += f"""
+        parts.append(f"""
 ### Analysis Scope
 - Binwalk signature scan results
 - File extraction and decompression results
@@ -266,38 +477,51 @@ Please ensure the analysis is professional, objective, and detailed.
 ## 3. Technical Details Analysis
 
 ### 3.1 Binwalk Recognition Results Details
-"""
-        
-        for firmware_name, report_data in analysis_data['reports'].items():
-            report += f"""
+""")
+        
+        for firmware_name, fw_data in per_firmware.items():
+            report_data = fw_data['reports'].get(firmware_name)
+            if report_data is None:
+                continue
+            extraction = report_data.get('api_results', {}).get('extraction', {})
+            parts.append(f"""
 #### {firmware_name}
 - **Analysis Time**: {report_data.get('analysis_timestamp', 'N/A')}
-- **Recognized Components Count**: {report_data['results']['api_results']['extraction']['count']}
+- **Recognized Components Count**: {extraction.get('count', 0)}
 
 **Recognized Components**:
-"""
-            for i, result in enumerate(report_data['results']['api_results']['extraction']['results'], 1):
-                report += f"{i}. **Offset {result['offset']}**: {result['description']}\n"
-        
-        report += """
+""")
+            results_list = extraction.get('results', [])
+            for i, result in enumerate(results_list, 1):
+                parts.append(f"{i}. **Offset {result['offset']}**: {result['description']}\n")
+            # The compressed payload keeps only the top entries; say so rather
+            # than silently listing fewer components than the count above
+            remaining = extraction.get('count', 0) - len(results_list)
+            if remaining > 0:
+                parts.append(f"... {remaining} more results (see the JSON analysis report for the full list)\n")
+
+        parts.append("""
 ### 3.2 Filesystem Extraction Analysis
-"""
-        
-        for firmware_name, structure in analysis_data['extracted_structure'].items():
-            report += f"""
+""")
+
+        for firmware_name, fw_data in per_firmware.items():
+            structure = fw_data['extracted_structure'].get(firmware_name)
+            if structure is None:
+                continue
+            parts.append(f"""
 #### {firmware_name} Extraction Results
 - **Extraction Success**: {'✅' if structure['extraction_success'] else '❌'}
 - **Squashfs Filesystem**: {'✅ Found' if structure['squashfs_found'] else '❌ Not Found'}
-"""
+""")
             if structure['filesystem_structure']:
-                report += f"- **Directory Structure**: {', '.join(structure['filesystem_structure'])}\n"
+                parts.append(f"- **Directory Structure**: {', '.join(structure['filesystem_structure'])}\n")
             
             if structure['file_counts']:
-                report += "- **File Statistics**:\n"
+                parts.append("- **File Statistics**:\n")
                 for file_type, count in structure['file_counts'].items():
-                    report += f"  - {file_type}: {count}\n"
+                    parts.append(f"  - {file_type}: {count}\n")
         
-        report += f"""
+        parts.append(f"""
 ---
 
 ## 4. Summary and Recommendations
@@ -320,28 +544,30 @@ Based on the above technical analysis and AI expert evaluation, the overall qual
 
 **Report Generator**: Auto-Binwalk AI Review System  
 **Technical Support**: GPT-4 based intelligent firmware analysis platform
-"""
+""")
         
-        return report
+        return "".join(parts)
     
     def run_review(self) -> str:
         """Execute complete review analysis process"""
         logger.info("Starting binwalk results review analysis...")
         
-        # Read analysis results
+        # Stream analysis results: each firmware's raw report is compressed as
+        # it is read, so only the compact payloads stay resident
         logger.info("Reading binwalk analysis results...")
-        analysis_data = self.read_analysis_results()
-        
-        if not analysis_data['reports']:
+        firmware_files = self._list_firmware_files()
+        per_firmware = dict(self.iter_firmwares(firmware_files))
+
+        if not any(fw_data['reports'] for fw_data in per_firmware.values()):
             raise ValueError("No binwalk analysis reports found, please run binwalk analysis first")
-        
+
         # Use LLM for analysis
         logger.info("Using large language model for intelligent analysis...")
-        llm_analysis = self.analyze_with_llm(analysis_data)
-        
+        llm_analysis = self.analyze_with_llm(per_firmware)
+
         # Generate detailed report
         logger.info("Generating detailed review report...")
-        detailed_report = self.generate_detailed_report(analysis_data, llm_analysis)
+        detailed_report = self.generate_detailed_report(firmware_files, per_firmware, llm_analysis)
         
         # Save report
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -350,7 +576,7 @@ Based on the above technical analysis and AI expert evaluation, the overall qual
         with open(report_file, 'w', encoding='utf-8') as f:
             f.write(detailed_report)
         
-        logger.info(f"Review report saved to: {report_file}")
+        logger.info("Review report saved to: %s", report_file)
         return str(report_file)
 
 
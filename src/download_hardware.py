@@ -6,226 +6,582 @@ Read hardware information from database/hardware.xlsx file, download correspondi
 """
 
 import os
-import pandas as pd
-import requests
+import io
+import time
+import atexit
+import asyncio
+import concurrent.futures
+import openpyxl
+import aiohttp
 import zipfile
+import queue
 import logging
+import logging.handlers
+import tempfile
 from pathlib import Path
-from urllib.parse import urlparse, unquote
-import time
+from urllib.parse import urlparse
 import shutil
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('../log/download.log'),
-        logging.StreamHandler()
-    ]
-)
+# Optional: SIMD (PCLMULQDQ) CRC32 for zipfile's per-member validation during
+# extraction; the stdlib table-driven CRC is the fallback
+try:
+    from fastcrc import crc32 as _fastcrc32
+    zipfile.crc32 = _fastcrc32.iso_hdlc
+except ImportError:
+    pass
+
+# Optional: Intel ISA-L SIMD inflate as a drop-in zlib for zipfile; DEFLATE
+# decompression is where extraction spends nearly all of its CPU
+try:
+    from isal import isal_zlib as _isal_zlib
+    zipfile.zlib = _isal_zlib
+except ImportError:
+    pass
+
+# Optional: multi-core DEFLATE decoder for very large members; single-threaded
+# inflate is the bottleneck for firmware zips holding one huge .bin
+try:
+    import rapidgzip as _rapidgzip
+except ImportError:
+    _rapidgzip = None
+
+# Below this compressed size the block-splitting overhead of the parallel
+# decoder outweighs the gain, so members stay on the stdlib path
+_PARALLEL_INFLATE_MIN_SIZE = 8 << 20
+
+# Configure logging: producers only enqueue records, a listener thread does
+# the formatting and the file/console writes off the download hot path
+_log_queue = queue.Queue(-1)
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_log_file_handler = logging.FileHandler('../log/download.log')
+_log_file_handler.setFormatter(_log_formatter)
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(_log_formatter)
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+# Pass records through unformatted; the listener-side handlers format them
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_log_queue_handler])
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, _log_file_handler, _log_stream_handler)
+_log_listener.start()
+# Flush queued records before logging.shutdown closes the handlers, so the
+# final summary lines are not lost at interpreter exit
+atexit.register(_log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
+def _init_extract_worker():
+    """Give extraction worker processes direct log handlers
+
+    Pool workers inherit the parent's QueueHandler but not its listener
+    thread, so anything they logged would sit in a copied queue forever.
+    Workers log rarely, so synchronous file/console writes are fine there.
+    """
+    root = logging.getLogger()
+    root.handlers.clear()
+    for handler in (logging.FileHandler('../log/download.log'),
+                    logging.StreamHandler()):
+        handler.setFormatter(_log_formatter)
+        root.addHandler(handler)
+
+# Single-pass sanitizer covering the path separators plus the remaining
+# characters that are illegal in Windows filenames
+_SAFE = str.maketrans({' ': '_', '/': '_', '\\': '_', ':': '_', '*': '_',
+                       '?': '_', '"': '_', '<': '_', '>': '_', '|': '_'})
+
+def _parallel_inflate(zip_ref, info, dest_path):
+    """Inflate one large DEFLATE member across all cores with rapidgzip
+
+    Returns False when rapidgzip is missing, the member is too small or
+    stored, or the decoder cannot handle the stream; the caller then falls
+    back to the stdlib streaming path. The raw compressed bytes are read
+    past zipfile's decompressor, so the per-member CRC check is skipped for
+    members inflated here.
+    """
+    if (_rapidgzip is None or info.compress_type != zipfile.ZIP_DEFLATED
+            or info.compress_size < _PARALLEL_INFLATE_MIN_SIZE):
+        return False
+    try:
+        with zip_ref.open(info) as member:
+            raw = member._fileobj.read(info.compress_size)
+        with _rapidgzip.open(io.BytesIO(raw), parallelization=os.cpu_count()) as inflater, \
+                open(dest_path, 'wb') as dst:
+            shutil.copyfileobj(inflater, dst, length=1 << 20)
+        return True
+    except Exception:
+        return False
+
+def _extract_member(zip_source, member_name, dest_path):
+    """Stream a single member to dest_path through its own ZipFile handle
+
+    ZipFile objects are not thread-safe, but independent read-only handles
+    over the same bytes or path are, and zlib releases the GIL while
+    inflating a buffer, so members opened this way decompress in parallel.
+    """
+    if isinstance(zip_source, (bytes, bytearray)):
+        source = io.BytesIO(zip_source)
+    else:
+        source = str(zip_source)
+    with zipfile.ZipFile(source, 'r') as zip_ref:
+        info = zip_ref.getinfo(member_name)
+        if not _parallel_inflate(zip_ref, info, dest_path):
+            with zip_ref.open(info) as src, open(dest_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst, length=1 << 20)
+
+def extract_zip(zip_source, keyword, download_dir, name_map=None):
+    """Extract only the .bin members of a zip archive, straight to download_dir
+
+    zip_source is either the raw archive bytes or a filesystem path.
+    name_map, when given, maps member names to pre-resolved destination
+    filenames (the async pipeline resolves collisions in the parent process);
+    without it, collisions are probed against the filesystem.
+
+    Module-level (and picklable) so it can run in a process pool: DEFLATE
+    decompression is CPU-bound and would serialize on the GIL in threads.
+    Streaming the wanted members directly avoids extracting the whole
+    archive to a temp tree, walking it, moving files and deleting the rest.
+    """
+    download_dir = Path(download_dir)
+    try:
+        safe_keyword = keyword.translate(_SAFE)
+
+        # Archives arrive as in-memory bytes from the download pipeline; a
+        # filesystem path still works for direct callers
+        if isinstance(zip_source, (bytes, bytearray)):
+            source = io.BytesIO(zip_source)
+        else:
+            source = str(zip_source)
+
+        with zipfile.ZipFile(source, 'r') as zip_ref:
+            # Select .bin members from the central directory without
+            # decompressing anything
+            infolist = zip_ref.infolist()
+            bin_members = [info for info in infolist
+                           if not info.is_dir() and info.filename.lower().endswith('.bin')]
+            logger.info(f"Extracting {keyword}: Found {len(infolist)} files, {len(bin_members)} .bin members")
+
+            if not bin_members:
+                logger.warning(f"No .bin files found: {keyword}")
+                if not isinstance(zip_source, (bytes, bytearray)):
+                    Path(zip_source).unlink()
+                return False
+
+            extracted_files = []
+            member_dests = []
+            # Names are resolved for every member before anything is written,
+            # so collisions must be probed against this set, not the
+            # filesystem: two members sharing a basename would otherwise both
+            # resolve to the same still-nonexistent destination
+            used_names = (None if name_map is not None
+                          else {entry.name for entry in os.scandir(download_dir)})
+            for info in bin_members:
+                bin_filename = os.path.basename(info.filename)
+
+                if name_map is not None:
+                    final_filename = name_map[info.filename]
+                else:
+                    # If multiple .bin files exist, add keyword prefix to avoid conflicts
+                    if len(bin_members) > 1:
+                        new_filename = f"{safe_keyword}_{bin_filename}"
+                    else:
+                        # If only one .bin file exists, rename it with keyword
+                        file_extension = os.path.splitext(bin_filename)[1]
+                        new_filename = f"{safe_keyword}{file_extension}"
+
+                    # Ensure unique filename
+                    counter = 1
+                    final_filename = new_filename
+                    while final_filename in used_names:
+                        name_part, ext_part = os.path.splitext(new_filename)
+                        final_filename = f"{name_part}_{counter}{ext_part}"
+                        counter += 1
+                    used_names.add(final_filename)
+
+                member_dests.append((info, download_dir / final_filename))
+                extracted_files.append(final_filename)
+                # Per-file chatter at debug: log flushing dominates for tiny bins
+                logger.debug(f"Extracted .bin file: {bin_filename} -> {final_filename}")
+
+            if len(member_dests) == 1:
+                info, dest_path = member_dests[0]
+                if not _parallel_inflate(zip_ref, info, dest_path):
+                    with zip_ref.open(info) as src, open(dest_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, length=1 << 20)
+            else:
+                # Independent members inflate in parallel on per-thread
+                # handles; zlib drops the GIL around each decompress call
+                workers = min(len(member_dests), os.cpu_count() or 1)
+                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(_extract_member, zip_source,
+                                               info.filename, dest_path)
+                               for info, dest_path in member_dests]
+                    for future in futures:
+                        future.result()
+
+        logger.info(f"Kept .bin files: {', '.join(extracted_files)}")
+
+        # Delete original zip file (in-memory archives just get garbage collected)
+        if not isinstance(zip_source, (bytes, bytearray)):
+            zip_path = Path(zip_source)
+            zip_path.unlink()
+            logger.info(f"Deleted zip file: {zip_path.name}")
+
+        return True
+
+    except zipfile.BadZipFile:
+        logger.error(f"Invalid zip file: {keyword}")
+        return False
+    except Exception as e:
+        logger.error(f"Extraction failed {keyword}: {e}")
+        return False
+
 class HardwareDownloader:
+    # Concurrent downloads; the semaphore also serves as the rate limit that
+    # the old fixed per-row sleep used to provide
+    MAX_CONCURRENT_DOWNLOADS = 8
+
+    # Archives up to this size are buffered entirely in memory; larger ones
+    # spill to an anonymous temp file outside the database directory
+    SPOOL_MAX_SIZE = 64 << 20
+
+    # Transient-failure retry policy: attempts beyond the first, the base
+    # backoff delay (doubled per attempt), and the statuses worth retrying
+    RETRY_TOTAL = 3
+    RETRY_BACKOFF = 0.5
+    RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+    # Minimum spacing between requests to the same host; requests to
+    # different hosts are never delayed
+    HOST_MIN_INTERVAL = 1.0
+
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
     def __init__(self, excel_file="../database/hardware.xlsx", download_dir="../database"):
         self.excel_file = excel_file
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(exist_ok=True)
+        # Already-used destination names; one scandir here replaces a stat()
+        # per collision probe in every extraction
+        self._used_names = {entry.name for entry in os.scandir(self.download_dir)}
+        self._names_lock = asyncio.Lock()
+        # Per-host politeness: next free request slot, keyed by netloc
+        self._host_slots = {}
+        self._host_lock = asyncio.Lock()
         
     def read_hardware_data(self):
-        """Read hardware data from Excel file"""
+        """Read hardware data from Excel file
+
+        Streams rows with openpyxl in read-only mode; for a two/three column
+        sheet this avoids importing the whole pandas/numpy stack just to get
+        tuples back out. Returns all rows (header first) as tuples.
+        """
         try:
-            df = pd.read_excel(self.excel_file)
+            workbook = openpyxl.load_workbook(self.excel_file, read_only=True, data_only=True)
+            try:
+                rows = list(workbook.active.iter_rows(values_only=True))
+            finally:
+                workbook.close()
             logger.info(f"Successfully read Excel file: {self.excel_file}")
-            logger.info(f"Found {len(df)} hardware records")
-            return df
+            logger.info(f"Found {max(len(rows) - 1, 0)} hardware records")
+            return rows
         except Exception as e:
             logger.error(f"Failed to read Excel file: {e}")
             return None
     
-    def get_filename_from_url(self, url):
-        """Extract filename from URL"""
-        parsed_url = urlparse(url)
-        filename = os.path.basename(parsed_url.path)
-        if filename:
-            return unquote(filename)
-        else:
-            return "download.zip"
-    
-    def download_file(self, url, keyword):
-        """Download a single file"""
+    async def _throttle_host(self, url):
+        """Wait until this host's next request slot comes up
+
+        Replaces the old unconditional one-second sleep between rows: each
+        host hands out slots HOST_MIN_INTERVAL apart, so back-to-back hits
+        on one vendor mirror stay polite while requests to different hosts
+        proceed immediately.
+        """
+        host = urlparse(url).netloc
+        async with self._host_lock:
+            now = time.monotonic()
+            slot = max(self._host_slots.get(host, 0) + self.HOST_MIN_INTERVAL, now)
+            self._host_slots[host] = slot
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _has_bin(self, session, url, keyword):
+        """Check the zip central directory for .bin members before downloading
+
+        The central directory sits at the end of the archive, so a
+        Range: bytes=-65536 request is enough for zipfile to list the member
+        names without decompressing anything. Returns False only when the
+        server honours the range (206) and no entry ends in .bin; any doubt
+        (no range support, truncated directory, network error) falls back to
+        the full download.
+        """
+        try:
+            async with session.get(url, headers={'Range': 'bytes=-65536'},
+                                   timeout=aiohttp.ClientTimeout(total=30)) as response:
+                if response.status != 206:
+                    return True
+                tail = await response.read()
+
+            with zipfile.ZipFile(io.BytesIO(tail)) as zip_ref:
+                if any(name.lower().endswith('.bin') for name in zip_ref.namelist()):
+                    return True
+
+            logger.info(f"Skipping download {keyword}: central directory lists no .bin files")
+            return False
+
+        except (aiohttp.ClientError, zipfile.BadZipFile, asyncio.TimeoutError):
+            # Central directory larger than the tail window, range ignored,
+            # or transient error: just download the whole archive
+            return True
+
+    def _open_spill_file(self, total_size):
+        """Open a named temp file for an archive too big to buffer in memory
+
+        When the final size is known, reserve its extent up front in one
+        metadata operation instead of growing the file write by write.
+        """
+        tmp = tempfile.NamedTemporaryFile(suffix='.zip', delete=False)
+        if total_size > 0 and hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(tmp.fileno(), 0, total_size)
+            except OSError:
+                pass
+        return tmp
+
+    async def download_file(self, session, url, keyword):
+        """Download a single file
+
+        Archives up to SPOOL_MAX_SIZE are returned as bytes; larger ones
+        spill to a named temp file whose path is returned instead, so a big
+        archive is never loaded into memory just to reach the extraction
+        worker (extract_zip deletes path sources once it is done with them).
+        Returns None on failure.
+        """
+        tmp = None
         try:
             logger.info(f"Starting download {keyword}: {url}")
-            
-            # Send request
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            # Determine filename
-            filename = self.get_filename_from_url(url)
-            if not filename.endswith('.zip'):
-                filename = f"{keyword}.zip"
-            
-            file_path = self.download_dir / filename
-            
-            # Download file
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded_size = 0
-            
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded_size += len(chunk)
-                        
-                        if total_size > 0:
-                            percent = (downloaded_size / total_size) * 100
-                            logger.info(f"Download progress {keyword}: {percent:.1f}%")
-            
-            logger.info(f"Download completed: {filename}")
-            return file_path
-            
-        except requests.exceptions.RequestException as e:
+
+            for attempt in range(self.RETRY_TOTAL + 1):
+                buf = io.BytesIO()
+                if tmp is not None:
+                    tmp.seek(0)
+                    tmp.truncate()
+                try:
+                    async with session.get(url, timeout=aiohttp.ClientTimeout(total=60)) as response:
+                        response.raise_for_status()
+
+                        total_size = int(response.headers.get('Content-Length', 0))
+                        downloaded_size = 0
+                        last_logged_pct = 0.0
+
+                        # An archive bigger than the spool limit goes to disk
+                        # regardless, so open the spill file immediately
+                        if tmp is None and total_size > self.SPOOL_MAX_SIZE:
+                            tmp = self._open_spill_file(total_size)
+
+                        # iter_any yields each received buffer as-is; unlike
+                        # iter_chunked there is no slice-and-reassemble copy
+                        # between the socket buffer and the spool
+                        async for chunk in response.content.iter_any():
+                            if tmp is not None:
+                                tmp.write(chunk)
+                            elif buf.tell() + len(chunk) > self.SPOOL_MAX_SIZE:
+                                # Unknown-length archive outgrew the spool
+                                tmp = self._open_spill_file(total_size)
+                                tmp.write(buf.getbuffer())
+                                tmp.write(chunk)
+                                buf = io.BytesIO()
+                            else:
+                                buf.write(chunk)
+                            downloaded_size += len(chunk)
+
+                            if total_size > 0:
+                                percent = (downloaded_size / total_size) * 100
+                                if percent - last_logged_pct >= 5:
+                                    last_logged_pct = percent
+                                    logger.info(f"Download progress {keyword}: {percent:.1f}%")
+                    break
+                except aiohttp.ClientResponseError as e:
+                    if e.status in self.RETRY_STATUSES and attempt < self.RETRY_TOTAL:
+                        delay = self.RETRY_BACKOFF * (2 ** attempt)
+                        logger.warning(
+                            f"Retrying {keyword} in {delay:.1f}s after HTTP {e.status} "
+                            f"(attempt {attempt + 1}/{self.RETRY_TOTAL})")
+                        await asyncio.sleep(delay)
+                        continue
+                    raise
+
+            logger.info(f"Download completed: {keyword}")
+            if tmp is not None:
+                tmp.close()
+                return Path(tmp.name)
+            return buf.getvalue()
+
+        except aiohttp.ClientError as e:
             logger.error(f"Download failed {keyword}: {e}")
-            return None
         except Exception as e:
             logger.error(f"Error occurred during download {keyword}: {e}")
-            return None
+        if tmp is not None:
+            tmp.close()
+            Path(tmp.name).unlink(missing_ok=True)
+        return None
     
     def extract_zip(self, zip_path, keyword):
         """Extract zip file and keep only .bin files"""
+        return extract_zip(zip_path, keyword, self.download_dir)
+
+    async def _resolve_names(self, archive, keyword):
+        """Map an archive's .bin members to unique destination filenames
+
+        archive is the raw bytes or a filesystem path; only the central
+        directory is read. Collisions are resolved against the in-memory name
+        set under a lock, so concurrent extract tasks cannot race each other
+        onto the same destination and no stat() probing is needed. Returns
+        None for a bad archive and an empty dict when there is nothing to
+        extract.
+        """
+        safe_keyword = keyword.translate(_SAFE)
+        if isinstance(archive, (bytes, bytearray)):
+            source = io.BytesIO(archive)
+        else:
+            source = str(archive)
         try:
-            # Create temporary extraction directory
-            safe_keyword = keyword.replace(' ', '_').replace('/', '_').replace('\\', '_')
-            temp_extract_dir = self.download_dir / f"temp_{safe_keyword}"
-            temp_extract_dir.mkdir(exist_ok=True)
-            
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                # Get list of files in the archive
-                file_list = zip_ref.namelist()
-                logger.info(f"Extracting {keyword}: Found {len(file_list)} files")
-                
-                # Extract all files to temporary directory
-                zip_ref.extractall(temp_extract_dir)
-            
-            # Find .bin files
-            bin_files = []
-            for root, dirs, files in os.walk(temp_extract_dir):
-                for file in files:
-                    if file.lower().endswith('.bin'):
-                        bin_files.append(os.path.join(root, file))
-            
-            if not bin_files:
-                logger.warning(f"No .bin files found: {keyword}")
-                # Clean up temporary directory
-                shutil.rmtree(temp_extract_dir)
-                zip_path.unlink()
-                return False
-            
-            # Move .bin files to database directory
-            moved_files = []
-            for bin_file_path in bin_files:
-                bin_filename = os.path.basename(bin_file_path)
-                
-                # If multiple .bin files exist, add keyword prefix to avoid conflicts
-                if len(bin_files) > 1:
+            with zipfile.ZipFile(source) as zip_ref:
+                bin_members = [info.filename for info in zip_ref.infolist()
+                               if not info.is_dir() and info.filename.lower().endswith('.bin')]
+        except zipfile.BadZipFile:
+            logger.error(f"Invalid zip file: {keyword}")
+            return None
+
+        name_map = {}
+        async with self._names_lock:
+            for member in bin_members:
+                bin_filename = os.path.basename(member)
+                if len(bin_members) > 1:
                     new_filename = f"{safe_keyword}_{bin_filename}"
                 else:
-                    # If only one .bin file exists, rename it with keyword
                     file_extension = os.path.splitext(bin_filename)[1]
                     new_filename = f"{safe_keyword}{file_extension}"
-                
-                # Ensure unique filename
+
                 counter = 1
                 final_filename = new_filename
-                while (self.download_dir / final_filename).exists():
+                while final_filename in self._used_names:
                     name_part, ext_part = os.path.splitext(new_filename)
                     final_filename = f"{name_part}_{counter}{ext_part}"
                     counter += 1
-                
-                dest_path = self.download_dir / final_filename
-                shutil.move(bin_file_path, dest_path)
-                moved_files.append(final_filename)
-                logger.info(f"Moved .bin file: {bin_filename} -> {final_filename}")
-            
-            # Clean up temporary directory
-            shutil.rmtree(temp_extract_dir)
-            logger.info(f"Cleaned up temporary files, kept .bin files: {', '.join(moved_files)}")
-            
-            # Delete original zip file
-            zip_path.unlink()
-            logger.info(f"Deleted zip file: {zip_path.name}")
-            
-            return True
-            
-        except zipfile.BadZipFile:
-            logger.error(f"Invalid zip file: {zip_path}")
-            return False
-        except Exception as e:
-            logger.error(f"Extraction failed {keyword}: {e}")
-            # Clean up temporary directory if it exists
-            if 'temp_extract_dir' in locals() and temp_extract_dir.exists():
-                try:
-                    shutil.rmtree(temp_extract_dir)
-                except:
-                    pass
-            return False
-    
+                self._used_names.add(final_filename)
+                name_map[member] = final_filename
+        return name_map
+
+    async def _process_row(self, semaphore, extract_slots, session, pool,
+                           index, total_count, keyword, download_link):
+        """Download and extract a single hardware record"""
+        async with semaphore:
+            logger.info(f"Processing ({index+1}/{total_count}): {keyword}")
+
+            # Cheap pre-flight: read only the archive tail and bail out
+            # before spending bandwidth on archives with nothing to extract
+            await self._throttle_host(download_link)
+            if not await self._has_bin(session, download_link, keyword):
+                return False
+
+            # Download file
+            await self._throttle_host(download_link)
+            archive = await self.download_file(session, download_link, keyword)
+            if archive is None:
+                return False
+
+            # Reserve an extraction slot before giving up the download slot:
+            # when extraction falls behind, new downloads wait instead of
+            # stacking finished archives in the parent without bound
+            await extract_slots.acquire()
+
+        try:
+            # Reserve destination names in this process (cheap: central
+            # directory only), then hand the archive - small ones as bytes,
+            # spilled ones by path - to a worker so CPUs run the decompression
+            name_map = await self._resolve_names(archive, keyword)
+            if not name_map:
+                if name_map is not None:
+                    logger.warning(f"No .bin files found: {keyword}")
+                if isinstance(archive, Path):
+                    archive.unlink(missing_ok=True)
+                return False
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                pool, extract_zip, archive, keyword, str(self.download_dir), name_map)
+        finally:
+            extract_slots.release()
+
+    async def _process_all(self, rows, total_count):
+        """Run all downloads concurrently on one event loop"""
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_DOWNLOADS)
+        pool_workers = os.cpu_count() or 1
+        # Bounds archives held between download and extraction; with the
+        # download semaphore this caps the parent's resident archive count
+        extract_slots = asyncio.Semaphore(pool_workers)
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=pool_workers, initializer=_init_extract_worker) as pool:
+            # One pooled session for every download: keep-alive amortizes the
+            # TCP+TLS handshake across archives from the same vendor mirror
+            connector = aiohttp.TCPConnector(limit=16, limit_per_host=16)
+            async with aiohttp.ClientSession(connector=connector,
+                                             headers={'User-Agent': self.USER_AGENT}) as session:
+                tasks = [self._process_row(semaphore, extract_slots, session, pool,
+                                           index, total_count, keyword, link)
+                         for index, keyword, link in rows]
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        success_count = 0
+        for (index, keyword, _), result in zip(rows, results):
+            if isinstance(result, Exception):
+                logger.error(f"Processing failed {keyword}: {result}")
+            elif result:
+                success_count += 1
+        return success_count
+
     def process_all_hardware(self):
         """Process all hardware downloads"""
         # Read Excel data
-        df = self.read_hardware_data()
-        if df is None:
+        data_rows = self.read_hardware_data()
+        if data_rows is None:
             return
-        
+        if not data_rows:
+            logger.error("Excel file is empty")
+            return
+
         # Check column names
-        columns = df.columns.tolist()
+        columns = [str(cell) for cell in data_rows[0]]
         logger.info(f"Excel file columns: {columns}")
-        
+
         # Use correct columns based on actual Excel file structure
         if len(columns) < 2:
             logger.error("Excel file needs at least two columns")
             return
-        
-        keyword_col = columns[0]  # First column is keyword
+
+        keyword_idx = 0  # First column is keyword
         # If there are 3 columns, use the last column; if only 2 columns, use the second column
-        if len(columns) >= 3:
-            link_col = columns[2]  # Third column is Download Link
-        else:
-            link_col = columns[1]  # Second column is Download Link
-        
-        logger.info(f"Using columns: keyword='{keyword_col}', download_link='{link_col}'")
-        
-        success_count = 0
-        total_count = len(df)
-        
-        for index, row in df.iterrows():
-            keyword = str(row[keyword_col]).strip()
-            download_link = str(row[link_col]).strip()
-            
-            if pd.isna(keyword) or pd.isna(download_link) or keyword == 'nan' or download_link == 'nan':
+        link_idx = 2 if len(columns) >= 3 else 1
+
+        logger.info(f"Using columns: keyword='{columns[keyword_idx]}', download_link='{columns[link_idx]}'")
+
+        total_count = len(data_rows) - 1
+        rows = []
+        for index, row in enumerate(data_rows[1:]):
+            keyword = row[keyword_idx] if len(row) > keyword_idx else None
+            download_link = row[link_idx] if len(row) > link_idx else None
+
+            if keyword is None or download_link is None \
+                    or not str(keyword).strip() or not str(download_link).strip():
                 logger.warning(f"Skipping row {index+1}: Missing keyword or download link")
                 continue
-            
-            logger.info(f"Processing ({index+1}/{total_count}): {keyword}")
-            
-            # Download file
-            zip_path = self.download_file(download_link, keyword)
-            if zip_path is None:
-                continue
-            
-            # Extract file
-            if self.extract_zip(zip_path, keyword):
-                success_count += 1
-            
-            # Add delay to avoid too frequent requests
-            time.sleep(1)
-        
+
+            rows.append((index, str(keyword).strip(), str(download_link).strip()))
+
+        # The downloads are pure I/O waits, so one event loop multiplexes them;
+        # total time approaches the slowest download instead of the sum
+        success_count = asyncio.run(self._process_all(rows, total_count))
+
         logger.info(f"Processing completed: Success {success_count}/{total_count}")
 
 def main():